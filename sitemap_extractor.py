@@ -9,25 +9,47 @@ Limitations:
 """
 
 import typer
-from typing import Optional, List, Set
+from typing import Iterable, Iterator, Optional, List, Set, Union
 from pathlib import Path
+import itertools
+import aiohttp
+import asyncio
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree as LET
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
 import json
-import pandas as pd
-import yaml
 import sys
-import questionary
 import os
 import random
 import time
 
-# Try to import Playwright for advanced extraction
+# Prefer orjson (C-level encoder) for JSON export when available
 try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-    PLAYWRIGHT_AVAILABLE = True
+    import orjson
 except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+    orjson = None
+
+# Playwright is imported lazily on first fallback use; the cached value is the
+# sync_playwright factory, or False when the package is not installed.
+_playwright_api = None
+
+
+def _get_sync_playwright():
+    """Import Playwright on first use so the CLI does not pay its import cost upfront."""
+    global _playwright_api
+    if _playwright_api is None:
+        try:
+            from playwright.sync_api import sync_playwright
+            _playwright_api = sync_playwright
+        except ImportError:
+            _playwright_api = False
+    return _playwright_api if _playwright_api else None
 
 app = typer.Typer(help="Extract URLs from a sitemap XML file (local or remote) and export them in various formats.")
 
@@ -41,6 +63,58 @@ USER_AGENTS = [
 
 MAX_SITEMAP_DEPTH = 20  # To avoid infinite loops in sitemap indexes
 
+CONCURRENT_FETCHES = 16  # Max simultaneous child sitemap downloads
+
+
+_COMMON_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "DNT": "1",
+    "Referer": "https://www.google.com/",
+    "sec-ch-ua": '"Chromium";v="122", "Not:A-Brand";v="99"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"Windows"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "cross-site",
+    "Sec-Fetch-User": "?1"
+}
+
+# One frozen header dict per user agent, built once at import so highly
+# parallel fetches don't rebuild a 15-field dict per request.
+_BASE_HEADERS = [{**_COMMON_HEADERS, "User-Agent": ua} for ua in USER_AGENTS]
+
+
+def build_request_headers() -> dict:
+    """Pick a prebuilt anti-bot header set at random."""
+    return random.choice(_BASE_HEADERS)
+
+
+# Shared session for all blocking fetches: the connection pool reuses TCP+TLS
+# sessions across child sitemaps (typically all on one host), and urllib3
+# Retry handles transient failures with exponential backoff.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+    ),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# Statuses that suggest anti-bot blocking or rate limiting, where a real
+# browser (Playwright) might still get through. Anything else (404, ...)
+# means the URL is simply wrong and a browser will not help.
+_BLOCKED_STATUSES = {401, 403, 429, 503}
+
 
 def log_public_ip():
     """Log the public IP used for requests."""
@@ -104,52 +178,148 @@ def apply_stealth(page):
     page.add_init_script(stealth_js)
 
 
-def read_sitemap(source: str) -> str:
+# On-disk cache for fetched sitemaps: bodies are stored gzip-compressed
+# (sitemap XML compresses ~15x) next to a small JSON metadata file holding
+# the ETag / Last-Modified validators. Re-runs against the same site then
+# cost a 304 revalidation — or nothing at all within the TTL — instead of a
+# full download. Disable with --no-cache.
+_CACHE_DIR = Path.home() / ".cache" / "sitemap_extractor"
+_CACHE_TTL = 3600  # Seconds an entry is served without revalidating
+_cache_enabled = True
+
+
+def _cache_base(url: str) -> Path:
+    return _CACHE_DIR / hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _cache_read(url: str):
+    """
+    Look up a cached sitemap. Returns (body, conditional_headers, fresh):
+    a fresh entry is within the TTL and usable without any request; a stale
+    one is only valid once the server answers 304 to the conditional headers.
+    """
+    if not _cache_enabled:
+        return None, {}, False
+    base = _cache_base(url)
+    try:
+        meta = json.loads(base.with_suffix(".meta.json").read_text(encoding="utf-8"))
+        body = gzip.decompress(base.with_suffix(".xml.gz").read_bytes())
+    except (OSError, ValueError):
+        return None, {}, False
+    if time.time() - meta.get("fetched_at", 0) <= _CACHE_TTL:
+        return body, {}, True
+    conditional = {}
+    if meta.get("etag"):
+        conditional["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        conditional["If-Modified-Since"] = meta["last_modified"]
+    if not conditional:
+        return None, {}, False  # Expired and nothing to revalidate against
+    return body, conditional, False
+
+
+def _cache_store(url: str, data: bytes, etag: Optional[str], last_modified: Optional[str]):
+    """Store a fetched sitemap body and its validators. Best-effort only."""
+    if not _cache_enabled:
+        return
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        base = _cache_base(url)
+        base.with_suffix(".xml.gz").write_bytes(gzip.compress(data))
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        base.with_suffix(".meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _maybe_gunzip(data: bytes) -> bytes:
+    """Decompress sitemaps served as .xml.gz (sniffed via the gzip magic bytes)."""
+    if data[:2] == b"\x1f\x8b":
+        return gzip.decompress(data)
+    return data
+
+
+class _ClosingGzipFile(gzip.GzipFile):
+    """GzipFile that also closes the stream it wraps on close()."""
+
+    def __init__(self, fileobj):
+        super().__init__(fileobj=fileobj)
+        self._wrapped = fileobj
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._wrapped.close()
+
+
+def _stream_with_gunzip(fileobj):
+    """File-like counterpart of _maybe_gunzip: peek at the magic bytes and wrap in GzipFile when needed."""
+    # urllib3 responses auto-close themselves at EOF, and BufferedReader
+    # mirrors the raw stream's closed flag — so even data already sitting in
+    # the buffer would raise "read of closed file". Keep the stream open
+    # until the consumer closes it.
+    if hasattr(fileobj, "auto_close"):
+        fileobj.auto_close = False
+    if not isinstance(fileobj, io.BufferedReader):
+        fileobj = io.BufferedReader(fileobj)
+    if fileobj.peek(2)[:2] == b"\x1f\x8b":
+        return _ClosingGzipFile(fileobj)
+    return fileobj
+
+
+def read_sitemap_bytes(source: str) -> Union[bytes, io.BufferedIOBase]:
     """
-    Download and return the sitemap XML content from a local file or URL.
+    Download and return the raw sitemap XML from a local file or URL.
     Tries requests with anti-bot headers, then Playwright (interactive) as fallback.
+    Returns bytes (letting the XML parser pick up the encoding from the XML
+    declaration itself, with no charset-detection pass), or a binary stream
+    when the cache is bypassed so parsing can overlap the download.
     """
     if source.startswith("http://") or source.startswith("https://"):
         last_exc = None
-        # Try up to 3 times with requests and anti-bot headers
-        for attempt in range(3):
-            user_agent = random.choice(USER_AGENTS)
-            headers = {
-                "User-Agent": user_agent,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-                "DNT": "1",
-                "Referer": "https://www.google.com/",
-                "sec-ch-ua": '"Chromium";v="122", "Not:A-Brand";v="99"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"Windows"',
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "cross-site",
-                "Sec-Fetch-User": "?1"
-            }
-            cookies = {
-                "sessionid": str(random.randint(100000, 999999)),
-                "_ga": str(random.randint(100000, 999999)),
-                "_gid": str(random.randint(100000, 999999)),
-            }
-            try:
-                resp = requests.get(source, headers=headers, cookies=cookies, timeout=15)
-                if resp.status_code == 200:
-                    resp.encoding = resp.apparent_encoding or resp.encoding
-                    return resp.text
-                else:
-                    typer.echo(f"[Warning] HTTP {resp.status_code} for {source} (attempt {attempt+1}/3)", err=True)
-                    typer.echo(f"[Debug] Headers: {headers}", err=True)
-            except Exception as e:
-                last_exc = e
-                typer.echo(f"[Warning] Error fetching {source} (attempt {attempt+1}/3): {e}", err=True)
-            time.sleep(random.uniform(2, 5) * (attempt + 1))
+        status = None
+        cached, conditional, fresh = _cache_read(source)
+        if fresh:
+            return cached
+        # Retries (with backoff, honoring Retry-After) are delegated to the
+        # urllib3 Retry mounted on the shared session, so a single get covers
+        # transient failures without blind sleeps.
+        headers = build_request_headers()
+        if conditional:
+            headers = {**headers, **conditional}
+        try:
+            resp = _SESSION.get(source, headers=headers, timeout=15, stream=not _cache_enabled)
+            status = resp.status_code
+            if status == 304 and cached is not None:
+                _cache_store(source, cached,
+                             resp.headers.get("ETag") or conditional.get("If-None-Match"),
+                             resp.headers.get("Last-Modified") or conditional.get("If-Modified-Since"))
+                return cached
+            if status == 200:
+                if not _cache_enabled:
+                    # Nothing to store, so hand the undecoded body straight to
+                    # the parser: parse time overlaps the network receive.
+                    resp.raw.decode_content = True
+                    return _stream_with_gunzip(resp.raw)
+                data = _maybe_gunzip(resp.content)
+                _cache_store(source, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                return data
+            typer.echo(f"[Warning] HTTP {status} for {source}", err=True)
+            typer.echo(f"[Debug] Headers: {headers}", err=True)
+        except Exception as e:
+            last_exc = e
+            typer.echo(f"[Warning] Error fetching {source}: {e}", err=True)
+        if status is not None and status not in _BLOCKED_STATUSES:
+            raise requests.RequestException(f"HTTP {status} for {source}")
         # Playwright fallback: interactive mode for manual extraction
-        if PLAYWRIGHT_AVAILABLE:
+        sync_playwright = _get_sync_playwright()
+        if sync_playwright is not None:
             typer.echo(f"[Info] Falling back to Playwright (interactive mode) for {source}", err=True)
             typer.echo("A Chromium window will open. If needed, interact with the page (solve captchas, click, scroll, reload, etc.), then return to this terminal and press Enter to capture the sitemap content.")
             try:
@@ -177,7 +347,7 @@ def read_sitemap(source: str) -> str:
                     try:
                         content = page.content()
                         browser.close()
-                        return content
+                        return content.encode("utf-8")
                     except Exception as e:
                         typer.echo(f"[Error] Could not capture the page content: {e}", err=True)
                         typer.echo("[Help] If you see the sitemap in the browser, you can save it manually and use the script in local file mode.", err=True)
@@ -188,127 +358,402 @@ def read_sitemap(source: str) -> str:
                 raise requests.RequestException(f"Playwright failed for {source}: {e}")
         else:
             typer.echo("[Error] Playwright is not installed. Run 'pip install playwright' and 'playwright install' to enable advanced extraction.", err=True)
-        raise requests.RequestException(f"Failed to fetch {source} after 3 attempts. Last error: {last_exc}")
+        raise requests.RequestException(f"Failed to fetch {source}. Last error: {last_exc}")
     else:
-        with open(source, "r", encoding="utf-8") as f:
-            return f.read()
+        with open(source, "rb") as f:
+            return _maybe_gunzip(f.read())
 
 
-def is_sitemap_index(xml_content: str) -> bool:
-    """Detect if the XML is a sitemap index."""
-    try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError:
-        return False
-    return root.tag.endswith('sitemapindex')
+# Compiled once: local-name() matches <loc> whether or not the sitemap
+# declares the namespace, so no per-call namespace map is needed.
+_LOC_XPATH = LET.XPath("//*[local-name()='loc']/text()")
+_RECOVERING_PARSER = LET.XMLParser(recover=True, huge_tree=False)
 
+# Below this size a one-shot fromstring parse is cheaper than iterparse
+_SMALL_SITEMAP_BYTES = 1 << 20
 
-def extract_sitemaps_from_index(xml_content: str) -> List[str]:
-    """Extract child sitemap URLs from a sitemap index XML."""
-    try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError as e:
-        typer.echo(f"Error parsing XML: {e}", err=True)
-        raise typer.Exit(1)
-    ns = {}
-    if root.tag.startswith('{'):
-        uri = root.tag.split('}')[0].strip('{')
-        ns = {'ns': uri}
-        loc_tag = './/ns:loc'
-    else:
-        loc_tag = './/loc'
-    sitemaps = [elem.text.strip() for elem in root.findall(loc_tag, ns) if elem.text]
-    return sitemaps
+
+def _to_xml_bytes(xml_content: Union[str, bytes]) -> bytes:
+    """Normalize sitemap content to bytes for the streaming parser."""
+    if isinstance(xml_content, str):
+        return xml_content.encode("utf-8", errors="replace")
+    return xml_content
+
+
+def parse_sitemap_stream(xml_content: Union[str, bytes, io.BufferedIOBase]) -> tuple:
+    """
+    Parse a sitemap or sitemap index in a single streaming pass.
+    Accepts bytes, str, or a binary file-like object — in the latter case
+    parsing overlaps with whatever feeds the stream (disk or socket reads).
+    Returns (is_index, locs): is_index is True when the root element is a
+    <sitemapindex>, and locs holds every <loc> value (child sitemap URLs for
+    an index, page URLs otherwise). Elements are cleared as soon as they are
+    consumed, so peak memory stays O(single element) even for 50MB sitemaps.
+    """
+    if hasattr(xml_content, "read"):
+        return _parse_stream(xml_content)
+    xml_bytes = _to_xml_bytes(xml_content)
+    if len(xml_bytes) <= _SMALL_SITEMAP_BYTES:
+        # Small document: one-shot parse with the precompiled XPath beats
+        # the event-loop overhead of iterparse.
+        try:
+            root = LET.fromstring(xml_bytes, parser=_RECOVERING_PARSER)
+        except LET.XMLSyntaxError as e:
+            typer.echo(f"Error parsing XML: {e}", err=True)
+            raise typer.Exit(1)
+        if root is None:
+            return False, []
+        is_index = root.tag.endswith("sitemapindex")
+        return is_index, [text for text in map(str.strip, _LOC_XPATH(root)) if text]
+    return _parse_stream(io.BytesIO(xml_bytes))
 
 
-def extract_urls_from_sitemap(xml_content: str) -> List[str]:
-    """Extract URLs from a sitemap XML (not an index)."""
+def _parse_stream(stream) -> tuple:
+    """Incremental half of parse_sitemap_stream: iterparse over any file-like."""
     try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError as e:
+        context = LET.iterparse(
+            stream,
+            events=("start", "end"),
+            huge_tree=False,
+            recover=True,
+        )
+        is_index = False
+        urls = []
+        append = urls.append
+        for event, elem in context:
+            if event == "start":
+                # The first start event is the root: detect index vs urlset
+                # without a separate parse pass.
+                is_index = elem.tag.endswith("sitemapindex")
+                break
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag.endswith("}loc") or elem.tag == "loc":
+                if elem.text:
+                    append(elem.text.strip())
+            elem.clear()
+            # The root has no parent, and its siblings (top-level PIs or
+            # comments, e.g. an xml-stylesheet declaration) must not be
+            # "freed" through it.
+            if elem.getparent() is not None:
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        return is_index, urls
+    except LET.XMLSyntaxError as e:
         typer.echo(f"Error parsing XML: {e}", err=True)
         raise typer.Exit(1)
-    ns = {}
-    if root.tag.startswith('{'):
-        uri = root.tag.split('}')[0].strip('{')
-        ns = {'ns': uri}
-        loc_tag = './/ns:loc'
-    else:
-        loc_tag = './/loc'
-    urls = [elem.text.strip() for elem in root.findall(loc_tag, ns) if elem.text]
-    return urls
 
 
-def extract_all_urls(source: str, depth: int = 0, visited: Optional[Set[str]] = None) -> List[str]:
+def is_sitemap_index(xml_content: Union[str, bytes]) -> bool:
+    """Detect if the XML is a sitemap index."""
+    return parse_sitemap_stream(xml_content)[0]
+
+
+def extract_sitemaps_from_index(xml_content: Union[str, bytes]) -> List[str]:
+    """Extract child sitemap URLs from a sitemap index XML (streaming)."""
+    return parse_sitemap_stream(xml_content)[1]
+
+
+def extract_urls_from_sitemap(xml_content: Union[str, bytes]) -> List[str]:
+    """Extract URLs from a sitemap XML (not an index), streaming."""
+    return parse_sitemap_stream(xml_content)[1]
+
+
+async def _fetch(session: aiohttp.ClientSession, source: str, sem: asyncio.Semaphore) -> Optional[Union[bytes, io.BufferedIOBase]]:
     """
-    Recursively extract all URLs from a sitemap or sitemap index, following child sitemaps.
+    Fetch one sitemap concurrently. Local paths are opened as streams so the
+    parser overlaps disk reads; HTTP sources go through aiohttp, falling back
+    to the blocking read_sitemap_bytes path (retries + interactive
+    Playwright) if the fast fetch fails.
     """
-    if visited is None:
-        visited = set()
-    if source in visited:
-        return []
-    visited.add(source)
+    if not (source.startswith("http://") or source.startswith("https://")):
+        try:
+            # Hand the open file to the parser so parsing overlaps disk reads
+            # instead of buffering the whole document first.
+            return _stream_with_gunzip(open(source, "rb"))
+        except OSError as e:
+            typer.echo(f"[Warning] Could not read {source}: {e}", err=True)
+            return None
+    cached, conditional, fresh = _cache_read(source)
+    if fresh:
+        return cached
+    headers = build_request_headers()
+    if conditional:
+        headers = {**headers, **conditional}
     try:
-        xml_content = read_sitemap(source)
+        async with sem:
+            async with session.get(
+                source,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=15),
+            ) as resp:
+                if resp.status == 304 and cached is not None:
+                    _cache_store(source, cached,
+                                 resp.headers.get("ETag") or conditional.get("If-None-Match"),
+                                 resp.headers.get("Last-Modified") or conditional.get("If-Modified-Since"))
+                    return cached
+                if resp.status == 200:
+                    data = _maybe_gunzip(await resp.read())
+                    _cache_store(source, data, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                    return data
+                typer.echo(f"[Warning] HTTP {resp.status} for {source}", err=True)
+    except Exception as e:
+        typer.echo(f"[Warning] Error fetching {source}: {e}", err=True)
+    # Fall back to the blocking path (retries + Playwright) in a worker thread
+    # so other fetches keep running.
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(None, read_sitemap_bytes, source)
     except requests.RequestException as e:
         typer.echo(f"[Warning] Could not fetch {source}: {e}", err=True)
-        return []
-    if is_sitemap_index(xml_content):
-        if depth >= MAX_SITEMAP_DEPTH:
-            typer.echo(f"Max sitemap index depth reached at {source}", err=True)
-            return []
-        typer.echo(f"Sitemap index detected: {source}\nFetching child sitemaps...")
-        child_sitemaps = extract_sitemaps_from_index(xml_content)
-        all_urls = []
-        for child in child_sitemaps:
-            typer.echo(f"  -> {child}")
-            try:
-                all_urls.extend(extract_all_urls(child, depth + 1, visited))
-            except Exception as e:
-                typer.echo(f"[Warning] Could not parse {child}: {e}", err=True)
-                continue
-        return all_urls
-    else:
+        return None
+
+
+class _SeenUrls:
+    """
+    Memory-compact membership set for the crawl's dedup. Same-site URLs
+    overwhelmingly share long prefixes (scheme + host + section), so each
+    URL is split at its last slash and the directory part is interned:
+    millions of entries then share one str per directory instead of
+    repeating the prefix bytes in every key.
+    """
+
+    def __init__(self):
+        self._tails = {}  # Interned directory prefix -> set of path tails
+
+    def add(self, url: str) -> bool:
+        """Record a URL; returns True when it was not seen before."""
+        head, _, tail = url.rpartition("/")
+        bucket = self._tails.setdefault(sys.intern(head), set())
+        if tail in bucket:
+            return False
+        bucket.add(tail)
+        return True
+
+
+def _sniff_root_kind(source: str) -> Optional[bool]:
+    """
+    Probe the first 512 bytes of a remote sitemap with a Range request to
+    detect <sitemapindex> vs <urlset> without downloading the body.
+    Returns True for an index, False for a urlset, None when inconclusive
+    (no range support, compressed payload, or any error).
+    """
+    headers = {**build_request_headers(), "Range": "bytes=0-511"}
+    try:
+        with _SESSION.get(source, headers=headers, timeout=15, stream=True) as resp:
+            if resp.status_code != 206:
+                return None
+            head = next(resp.iter_content(512), b"")
+    except Exception:
+        return None
+    if head[:2] == b"\x1f\x8b":
+        return None
+    if b"sitemapindex" in head:
+        return True
+    if b"urlset" in head:
+        return False
+    return None
+
+
+async def _open_session() -> aiohttp.ClientSession:
+    """Create the aiohttp session from inside the event loop."""
+    return aiohttp.ClientSession()
+
+
+async def _fetch_level(session: aiohttp.ClientSession, urls: List[str], sem: asyncio.Semaphore) -> List[Optional[bytes]]:
+    """Fetch one BFS level of sitemaps concurrently."""
+    return await asyncio.gather(*[_fetch(session, u, sem) for u in urls])
+
+
+def iter_all_urls(source: str) -> Iterator[str]:
+    """
+    Stream unique URLs from a sitemap or sitemap index, following child
+    sitemaps. Each level of an index is downloaded concurrently, and URLs are
+    yielded as soon as their sitemap is parsed, so the output stage can write
+    while deeper levels are still being fetched — peak memory stays around
+    one sitemap instead of the full URL list.
+    """
+    visited: Set[str] = set()
+    seen = _SeenUrls()  # Page URLs already yielded, for cross-sitemap dedup
+    is_remote = source.startswith("http://") or source.startswith("https://")
+    # A fresh cache entry will serve the body locally, so don't send even a
+    # Range probe to the origin — warm re-runs must stay at zero requests.
+    if is_remote and not _cache_read(source)[2] \
+            and _sniff_root_kind(source) is False:
+        # The root is a plain urlset: no children to fan out over, so skip
+        # the async machinery and parse the (possibly streamed) blocking
+        # fetch directly.
+        try:
+            content = read_sitemap_bytes(source)
+        except requests.RequestException as e:
+            typer.echo(f"[Warning] Could not fetch {source}: {e}", err=True)
+            return
         try:
-            return extract_urls_from_sitemap(xml_content)
+            _, locs = parse_sitemap_stream(content)
         except Exception as e:
             typer.echo(f"[Warning] Could not parse {source}: {e}", err=True)
-            return []
+            return
+        finally:
+            if hasattr(content, "close"):
+                content.close()
+        for url in locs:
+            if seen.add(url):
+                yield url
+        return
+    # A generator cannot hold an async with open across yields, so drive a
+    # private event loop per crawl and close the session when done.
+    loop = asyncio.new_event_loop()
+    try:
+        session = loop.run_until_complete(_open_session())
+        try:
+            sem = asyncio.Semaphore(CONCURRENT_FETCHES)
+            level = [source]
+            depth = 0
+            while level:
+                if depth > MAX_SITEMAP_DEPTH:
+                    typer.echo("Max sitemap index depth reached", err=True)
+                    break
+                pending = [u for u in level if u not in visited]
+                visited.update(pending)
+                contents = loop.run_until_complete(_fetch_level(session, pending, sem))
+                next_level: List[str] = []
+                for src, content in zip(pending, contents):
+                    if content is None:
+                        continue
+                    try:
+                        is_index, locs = parse_sitemap_stream(content)
+                    except Exception as e:
+                        typer.echo(f"[Warning] Could not parse {src}: {e}", err=True)
+                        continue
+                    finally:
+                        if hasattr(content, "close"):
+                            content.close()
+                    if is_index:
+                        typer.echo(f"Sitemap index detected: {src}\nFetching child sitemaps...")
+                        for child in locs:
+                            typer.echo(f"  -> {child}")
+                        next_level.extend(locs)
+                    else:
+                        # Paginated children of real-world indexes often repeat
+                        # URLs; dedup as we go so duplicates never accumulate.
+                        for url in locs:
+                            if seen.add(url):
+                                yield url
+                level = next_level
+                depth += 1
+        finally:
+            loop.run_until_complete(session.close())
+    finally:
+        loop.close()
+
+
+def extract_all_urls(source: str) -> List[str]:
+    """
+    Extract all URLs from a sitemap or sitemap index, following child sitemaps.
+    Child sitemaps of an index are downloaded concurrently.
+    """
+    return list(iter_all_urls(source))
+
+
+class _CountingIter:
+    """Pass-through iterator that counts items, for post-write total logging."""
+
+    def __init__(self, items: Iterable[str]):
+        self._items = items
+        self.count = 0
 
+    def __iter__(self) -> Iterator[str]:
+        for item in self._items:
+            self.count += 1
+            yield item
 
-def output_urls(urls: List[str], fmt: str, output: Optional[Path]):
-    """Export the list of URLs in the chosen format."""
+
+def output_urls(urls: Iterable[str], fmt: str, output: Optional[Path]):
+    """
+    Export URLs in the chosen format. Accepts any iterable: streaming formats
+    (txt, csv, xlsx) write URLs as they arrive from the crawl, single-shot
+    formats (json, yaml, parquet) materialize the list first.
+    """
     fmt = fmt.lower()
     if fmt == "txt":
-        content = "\n".join(urls)
         if output:
-            output.write_text(content, encoding="utf-8")
+            # Write URLs one by one: peak memory stays O(single URL) instead
+            # of one contiguous str of the whole list; bytes mode skips the
+            # text-layer copy and the 1MB buffer keeps syscall counts low.
+            with output.open("wb", buffering=1 << 20) as f:
+                f.writelines(u.encode("utf-8") + b"\n" for u in urls)
         else:
-            print(content, end="")
+            # Raw buffer writes bypass the text codec and print machinery;
+            # suppress BrokenPipeError so piping into head stays clean.
+            out = sys.stdout.buffer
+            write = out.write
+            nl = b"\n"
+            with contextlib.suppress(BrokenPipeError):
+                for u in urls:
+                    write(u.encode("utf-8"))
+                    write(nl)
+                out.flush()
     elif fmt == "json":
-        content = json.dumps(urls, indent=2, ensure_ascii=False)
-        if output:
-            output.write_text(content, encoding="utf-8")
+        url_list = list(urls)
+        if orjson is not None:
+            data = orjson.dumps(url_list, option=orjson.OPT_INDENT_2)
         else:
-            print(content, end="")
-    elif fmt == "csv":
-        df = pd.DataFrame(urls, columns=["url"])
+            data = json.dumps(url_list, indent=2, ensure_ascii=False).encode("utf-8")
         if output:
-            df.to_csv(output, index=False)
+            output.write_bytes(data)
         else:
-            print(df.to_csv(index=False), end="")
+            with contextlib.suppress(BrokenPipeError):
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+    elif fmt == "csv":
+        buf = output.open("w", encoding="utf-8", newline="", buffering=1 << 20) if output else sys.stdout
+        try:
+            writer = csv.writer(buf)
+            writer.writerow(["url"])
+            writer.writerows((u,) for u in urls)
+        finally:
+            if output:
+                buf.close()
     elif fmt == "xlsx":
-        df = pd.DataFrame(urls, columns=["url"])
         if output:
-            df.to_excel(output, index=False)
+            from openpyxl import Workbook
+            # Write-only mode streams rows to disk instead of materializing
+            # the whole sheet in memory.
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet()
+            ws.append(["url"])
+            for u in urls:
+                ws.append([u])
+            wb.save(str(output))
         else:
             print("[XLSX output cannot be displayed in terminal. Please specify an output file with --output/-o]", file=sys.stderr)
+    elif fmt == "parquet":
+        if output:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # Columnar binary format: writes an order of magnitude faster
+            # than xlsx and compresses well for large URL lists.
+            pq.write_table(pa.table({"url": list(urls)}), output, compression="zstd")
+        else:
+            print("[Parquet output cannot be displayed in terminal. Please specify an output file with --output/-o]", file=sys.stderr)
     elif fmt == "yaml":
-        content = yaml.dump(urls, allow_unicode=True)
+        import yaml
+        # Prefer the libyaml C emitter when PyYAML was built with it
+        try:
+            from yaml import CSafeDumper as _YamlDumper
+        except ImportError:
+            from yaml import SafeDumper as _YamlDumper
+        urls = list(urls)
         if output:
-            output.write_text(content, encoding="utf-8")
+            # Stream straight to the file instead of building the full
+            # document string in memory first.
+            with output.open("w", encoding="utf-8", buffering=1 << 20) as f:
+                yaml.dump(urls, stream=f, Dumper=_YamlDumper,
+                          allow_unicode=True, default_flow_style=False)
         else:
-            print(content, end="")
+            yaml.dump(urls, stream=sys.stdout, Dumper=_YamlDumper,
+                      allow_unicode=True, default_flow_style=False)
     else:
         typer.echo(f"Unsupported format: {fmt}", err=True)
         raise typer.Exit(1)
@@ -316,6 +761,7 @@ def output_urls(urls: List[str], fmt: str, output: Optional[Path]):
 
 def interactive_mode():
     """Run the interactive CLI mode for less technical users."""
+    import questionary
     # Show public IP in the interactive title
     try:
         ip = requests.get("https://api.ipify.org", timeout=10).text
@@ -340,7 +786,7 @@ def interactive_mode():
     # 2. Output format
     fmt = questionary.select(
         "Choose output format:",
-        choices=["txt", "json", "csv", "xlsx", "yaml"]
+        choices=["txt", "json", "csv", "xlsx", "yaml", "parquet"]
     ).ask()
     # 3. Output destination
     output_choice = questionary.select(
@@ -359,12 +805,17 @@ def interactive_mode():
     # 4. Run extraction
     typer.echo("\nExtracting URLs...\n")
     try:
-        urls = extract_all_urls(source)
-        if not urls:
+        url_iter = iter_all_urls(source)
+        first = next(url_iter, None)
+        if first is None:
             typer.echo("No URLs found in the sitemap.", err=True)
             raise typer.Exit(1)
-        typer.echo(f"Total URLs extracted: {len(urls)}")
-        output_urls(urls, fmt, output)
+        counted = _CountingIter(itertools.chain([first], url_iter))
+        output_urls(counted, fmt, output)
+        # Formats that need an output file leave the iterator untouched when
+        # none is given; don't report a misleading zero total.
+        if counted.count:
+            typer.echo(f"Total URLs extracted: {counted.count}")
         typer.echo("\nDone!")
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
@@ -375,12 +826,15 @@ def interactive_mode():
 def main(
     source: Optional[str] = typer.Argument(None, help="Path to the local sitemap XML file or URL."),
     output: Optional[Path] = typer.Option(None, "--output", "-o", help="Output file path. If not set, print to stdout."),
-    format: str = typer.Option("txt", "--format", "-f", help="Output format: txt, json, csv, xlsx, yaml."),
-    interactive: bool = typer.Option(False, "--interactive", "-i", help="Run in interactive mode.")
+    format: str = typer.Option("txt", "--format", "-f", help="Output format: txt, json, csv, xlsx, yaml, parquet."),
+    interactive: bool = typer.Option(False, "--interactive", "-i", help="Run in interactive mode."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the on-disk sitemap cache and always re-download.")
 ):
     """
     Extract URLs from a sitemap XML file (local or remote) and export them in various formats.
     """
+    global _cache_enabled
+    _cache_enabled = not no_cache
     log_public_ip()
     if interactive:
         interactive_mode()
@@ -389,12 +843,17 @@ def main(
         typer.echo("Error: You must provide a source (file path or URL) unless using --interactive.", err=True)
         raise typer.Exit(1)
     try:
-        urls = extract_all_urls(source)
-        if not urls:
+        url_iter = iter_all_urls(source)
+        first = next(url_iter, None)
+        if first is None:
             typer.echo("No URLs found in the sitemap.", err=True)
             raise typer.Exit(1)
-        typer.echo(f"Total URLs extracted: {len(urls)}")
-        output_urls(urls, format, output)
+        counted = _CountingIter(itertools.chain([first], url_iter))
+        output_urls(counted, format, output)
+        # Formats that need an output file leave the iterator untouched when
+        # none is given; don't report a misleading zero total.
+        if counted.count:
+            typer.echo(f"Total URLs extracted: {counted.count}")
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1)
@@ -0,0 +1,66 @@
+import gzip
+import io
+
+from sitemap_extractor import parse_sitemap_stream, _stream_with_gunzip
+
+# WordPress/Yoast and many generators emit an xml-stylesheet processing
+# instruction before the root element; the element-clearing loop must not
+# trip over these root-level siblings.
+SITEMAP_WITH_LEADING_PI = b"""<?xml version="1.0" encoding="UTF-8"?>
+<?xml-stylesheet type="text/xsl" href="//example.com/main-sitemap.xsl"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc></url>
+  <url><loc>https://example.com/about</loc></url>
+</urlset>
+"""
+
+
+def test_leading_pi_bytes():
+    is_index, urls = parse_sitemap_stream(SITEMAP_WITH_LEADING_PI)
+    assert not is_index
+    assert urls == ["https://example.com/", "https://example.com/about"]
+
+
+def test_leading_pi_stream():
+    # File-like input always takes the incremental iterparse path.
+    is_index, urls = parse_sitemap_stream(io.BytesIO(SITEMAP_WITH_LEADING_PI))
+    assert not is_index
+    assert urls == ["https://example.com/", "https://example.com/about"]
+
+
+class _AutoClosingBody(io.BytesIO):
+    """Mimics urllib3.HTTPResponse: auto-closes itself once read to EOF."""
+
+    auto_close = True
+
+    def _maybe_close(self):
+        if self.auto_close and not self.closed and self.tell() >= len(self.getvalue()):
+            self.close()
+
+    def read(self, *args):
+        data = super().read(*args)
+        self._maybe_close()
+        return data
+
+    def readinto(self, b):
+        n = super().readinto(b)
+        self._maybe_close()
+        return n
+
+
+def test_auto_closing_stream_survives_parse():
+    # A streamed HTTP body must stay readable after EOF is reached, even
+    # though urllib3 would close the raw stream there.
+    body = _AutoClosingBody(SITEMAP_WITH_LEADING_PI)
+    is_index, urls = parse_sitemap_stream(_stream_with_gunzip(body))
+    assert not is_index
+    assert urls == ["https://example.com/", "https://example.com/about"]
+
+
+def test_gunzip_stream_closes_underlying():
+    body = _AutoClosingBody(gzip.compress(SITEMAP_WITH_LEADING_PI))
+    stream = _stream_with_gunzip(body)
+    _, urls = parse_sitemap_stream(stream)
+    assert urls == ["https://example.com/", "https://example.com/about"]
+    stream.close()
+    assert body.closed